@@ -1,11 +1,24 @@
 from typing import Any
 
 import numpy as np
+import scipy.linalg as la
+import scipy.sparse as sp
 from numpy.typing import NDArray
+from scipy.sparse.linalg import splu
 
 from .schemas import DIRICHLET
 from .schemas import NEUMANN
 
+try:
+    from numba import njit
+    from numba import prange
+except ImportError:  # pragma: no cover
+    njit = None
+    prange = range
+
+# Row-major entries of the unit bar stiffness [[1, -1], [-1, 1]]
+_KE_TEMPLATE = np.array([1.0, -1.0, -1.0, 1.0])
+
 
 def first_fe_code(
     coords: NDArray[float],
@@ -14,6 +27,7 @@ def first_fe_code(
     dloads: list[dict],
     materials: dict[str, Any],
     block_elem_map: dict[int, tuple[int, int]],
+    assembler: "FirstFEAssembler | None" = None,
 ) -> dict[str, Any]:
     """
     Assemble and solve a 1D linear finite element (FE) problem for axial deformation.
@@ -62,6 +76,10 @@ def first_fe_code(
     block_elem_map : dict[int, tuple[int, int]]
         Maps global element IDs (used in `dloads`) to the tuple
         (block_index, local_element_index_within_block).
+    assembler : FirstFEAssembler, optional
+        Stiffness assembler built for these same `coords` and `blocks` objects.
+        Passing the same assembler to repeated solves on a fixed mesh reuses its
+        cached sparsity pattern. A new assembler is created if not given.
 
     Returns
     -------
@@ -69,8 +87,9 @@ def first_fe_code(
         Dictionary containing:
             - "dofs" : NDArray[float]
                 Solved global nodal displacement vector.
-            - "stiff" : NDArray[float]
-                Assembled global stiffness matrix.
+            - "stiff" : scipy.sparse.csr_matrix
+                Assembled global stiffness matrix in sparse CSR form. Use
+                ``.toarray()`` for a dense copy.
             - "force" : NDArray[float]
                 Assembled global force vector (after loads and BCs applied).
 
@@ -78,7 +97,8 @@ def first_fe_code(
     ------
     ValueError
         If element length is zero, a distributed load references an unknown
-        element, or load direction is invalid.
+        element, load direction is invalid, or `assembler` was built for other
+        `coords` or `blocks`.
     NotImplementedError
         If a distributed load type is not supported (only "BX" and "GRAV" are allowed).
 
@@ -120,36 +140,80 @@ def first_fe_code(
     array([0.0, 4.7619e-06])  # approximate
     """
 
-    dof_per_node = 1
-    num_node = coords.shape[0]
-    num_dof = num_node * dof_per_node
-    K = np.zeros((num_dof, num_dof), dtype=float)
-    F = np.zeros(num_dof, dtype=float)
-
     # Assemble global stiffness
-    for block in blocks:
-        A = block["element"]["properties"]["area"]
-        material = materials[block["material"]]
-        E = material["parameters"]["E"]
-        for nodes in block["connect"]:
-            # GLOBAL DOF = NODE NUMBER x NUMBER OF DOF PER NODE + LOCAL DOF
-            eft = [global_dof(n, j, dof_per_node) for n in nodes for j in range(dof_per_node)]
-
-            xe = coords[nodes]
-            he = xe[1, 0] - xe[0, 0]
-            if np.isclose(he, 0.0):
-                raise ValueError(f"Zero-length element detected between nodes {nodes}")
-            ke = A * E / he * np.array([[1.0, -1.0], [-1.0, 1.0]])
-            K[np.ix_(eft, eft)] += ke
+    if assembler is None:
+        assembler = FirstFEAssembler(coords, blocks, dof_per_node=1)
+    else:
+        assembler.check_mesh(coords, blocks)
+    K = assembler.stiffness(materials)
+    return _solve_first_fe(K, bcs, dloads, materials, block_elem_map, assembler)
+
+
+def first_fe_code_batched(
+    coords: NDArray[float],
+    blocks: list[dict],
+    bcs: list[dict],
+    dloads: list[dict],
+    materials_batch: list[dict[str, Any]],
+    block_elem_map: dict[int, tuple[int, int]],
+    assembler: "FirstFEAssembler | None" = None,
+) -> list[dict[str, Any]]:
+    """Solve the 1D bar problem of :func:`first_fe_code` for a batch of material sets.
+
+    All members of the batch share the mesh, boundary conditions and loads and differ
+    only in material parameters, as in a parameter study. The stiffness matrices of the
+    whole batch are assembled in one pass by :meth:`FirstFEAssembler.stiffness_batch`
+    and each system is then solved in turn.
+
+    Only material parameters (Young's modulus, and density for gravity loads) can vary
+    across the batch. Sweeps over block areas or load values are not batched; solve
+    them with repeated calls to :func:`first_fe_code` that share one assembler, which
+    reuses the cached sparsity pattern and reads areas on every call.
+
+    Parameters
+    ----------
+    materials_batch : list of dict[str, Any]
+        One material database, as described in :func:`first_fe_code`, per batch member.
+
+    See :func:`first_fe_code` for the remaining parameters.
+
+    Returns
+    -------
+    solutions : list of dict[str, Any]
+        One solution dictionary, as returned by :func:`first_fe_code`, per batch member.
+
+    """
+    if assembler is None:
+        assembler = FirstFEAssembler(coords, blocks, dof_per_node=1)
+    else:
+        assembler.check_mesh(coords, blocks)
+    stiffs = assembler.stiffness_batch(materials_batch)
+    return [
+        _solve_first_fe(K, bcs, dloads, materials, block_elem_map, assembler)
+        for K, materials in zip(stiffs, materials_batch)
+    ]
+
+
+def _solve_first_fe(
+    K: sp.csr_matrix,
+    bcs: list[dict],
+    dloads: list[dict],
+    materials: dict[str, Any],
+    block_elem_map: dict[int, tuple[int, int]],
+    assembler: "FirstFEAssembler",
+) -> dict[str, Any]:
+    """Assemble the force vector, apply boundary conditions and solve ``K * u = F``"""
+    dof_per_node = assembler.dof_per_node
+    num_dof = assembler.num_dof
+    F = np.zeros(num_dof, dtype=float)
 
     # Apply Neumann boundary conditions to force
-    for bc in bcs:
-        if bc["type"] == NEUMANN:
-            for n in bc["nodes"]:
-                I = global_dof(n, bc["local_dof"], dof_per_node)
-                F[I] += bc["value"]
+    neu_idx, neu_val = boundary_dofs(bcs, NEUMANN, dof_per_node)
+    F += np.bincount(neu_idx, weights=neu_val, minlength=num_dof)
 
     # Apply distributed loads
+    if dloads:
+        assembler.element_arrays(block_elem_map)
     for dload in dloads:
         dtype = dload["type"]
         direction = np.array(dload["direction"], dtype=float)
@@ -158,29 +222,31 @@ def first_fe_code(
         sign = np.sign(direction[0])
         if sign == 0.0:
             raise ValueError(f"dload direction must be ±1, got {direction[0]}")
-        for eid in dload["elements"]:
-            if eid not in block_elem_map:
-                raise ValueError(
-                    f"Element {eid} in distributed load "
-                    f"{dload['name']} not found in any element block"
-                )
-            block_index, local_index = block_elem_map[eid]
-            block = blocks[block_index]
-            nodes = block["connect"][local_index]
-            xe = coords[nodes]
-            he = xe[1, 0] - xe[0, 0]
-            A = block["element"]["properties"]["area"]
-            if dtype == "BX":
-                q = dload["value"] * sign
-            elif dtype == "GRAV":
-                mat = materials[block["material"]]
-                rho = mat["density"]
-                q = rho * A * dload["value"] * sign
-            else:
-                raise NotImplementedError(f"dload type {dtype!r} not supported for 1D")
-            eft = [global_dof(n, j, dof_per_node) for n in nodes for j in range(dof_per_node)]
-            qe = q * he / 2 * np.ones(2)
-            F[eft] += qe
+        eids = np.asarray(dload["elements"], dtype=np.intp)
+        known = (eids >= 0) & (eids < len(assembler.eid_to_block))
+        known[known] = assembler.eid_to_block[eids[known]] >= 0
+        if not np.all(known):
+            raise ValueError(
+                f"Element {eids[~known][0]} in distributed load "
+                f"{dload['name']} not found in any element block"
+            )
+        # The load type is resolved once per load to a scalar coefficient and, for
+        # gravity loads, a per-element mass per unit length
+        coef = dload["value"] * sign
+        if dtype == "BX":
+            q = coef
+        elif dtype == "GRAV":
+            # Density is only required of the materials of the loaded blocks
+            elem_block = assembler.eid_to_block[eids]
+            loaded = np.unique(elem_block)
+            rho = np.full(len(assembler.block_material), np.nan)
+            rho[loaded] = assembler.block_density(materials, loaded)
+            q = coef * rho[elem_block] * assembler.block_area()[elem_block]
+        else:
+            raise NotImplementedError(f"dload type {dtype!r} not supported for 1D")
+        eft = element_freedom_table(assembler.eid_to_conn[eids], dof_per_node)
+        qe = q * assembler.eid_to_he[eids] / 2
+        F += np.bincount(eft.ravel(), weights=np.repeat(qe, 2), minlength=num_dof)
 
     # Apply Dirchlet boundary conditions using a symmetry preserving elimination
     # Let
@@ -195,25 +261,18 @@ def first_fe_code(
     #
     # Eliminate prescribed dofs:
     #   K_ff.u_f = Ff - K_fp.u_p
-    prescribed_dofs: list[int] = []
-    prescribed_vals: list[float] = []
-    for bc in bcs:
-        if bc["type"] == DIRICHLET:
-            for n in bc["nodes"]:
-                I = global_dof(n, bc["local_dof"], dof_per_node)
-                prescribed_dofs.append(I)
-                prescribed_vals.append(bc["value"])
-
-    all_dofs = np.arange(num_dof)
-    free_dofs = np.setdiff1d(all_dofs, prescribed_dofs)
-    Kff = K[np.ix_(free_dofs, free_dofs)]
-    Kfp = K[np.ix_(free_dofs, prescribed_dofs)]
-    Ff = F[free_dofs] - np.dot(Kfp, prescribed_vals)
-    uf = np.linalg.solve(Kff, Ff)
+    prescribed_dofs, prescribed_vals = boundary_dofs(bcs, DIRICHLET, dof_per_node)
+    free_mask = np.ones(num_dof, dtype=bool)
+    free_mask[prescribed_dofs] = False
+    Kf = K[free_mask]
+    Kff = Kf[:, free_mask]
+    Kfp = Kf[:, prescribed_dofs]
+    Ff = F[free_mask] - Kfp @ prescribed_vals
+    uf = solve_reduced(Kff, Ff)
 
     # solve the system
     dofs = np.zeros(num_dof, dtype=float)
-    dofs[free_dofs] = uf
+    dofs[free_mask] = uf
     dofs[prescribed_dofs] = prescribed_vals
 
     solution = {"dofs": dofs, "stiff": K, "force": F}
@@ -221,6 +280,182 @@ def first_fe_code(
     return solution
 
 
+class FirstFEAssembler:
+    """Assembler for the global stiffness of a fixed 1D bar mesh.
+
+    The assembler is bound to the ``coords`` and block connectivity it is built
+    with; they must not change while it is in use. Block areas and material
+    properties are read on every assembly, gathered per block rather than per
+    element.
+
+    Element contributions are collected as COO triplets (rows, cols, data) and
+    converted to CSR, summing duplicate entries. The CSR sparsity pattern depends
+    only on the mesh, so it is built on the first call to :meth:`stiffness` along
+    with the element data for unit ``A * E`` and a linear map ``coo_to_csr`` from COO
+    data to CSR data. Later calls only scale the element data and apply the map.
+
+    Parameters
+    ----------
+    coords : (num_nodes, 1) NDArray[float]
+        Array of nodal coordinates along the 1D domain.
+    blocks : list of dict
+        Element block definitions, as for :func:`first_fe_code`.
+    dof_per_node : int
+        Number of degrees of freedom associated with each node. Two-node bar
+        elements carry only the axial dof, so this must be 1.
+
+    Raises
+    ------
+    NotImplementedError
+        If `dof_per_node` is not 1.
+
+    Examples
+    --------
+    >>> assembler = FirstFEAssembler(coords, blocks)
+    >>> for E in (100.0, 200.0):
+    ...     materials["steel"]["parameters"]["E"] = E
+    ...     result = first_fe_code(
+    ...         coords, blocks, bcs, dloads, materials, block_elem_map, assembler=assembler
+    ...     )
+
+    """
+
+    def __init__(self, coords: NDArray[float], blocks: list[dict], dof_per_node: int = 1) -> None:
+        if dof_per_node != 1:
+            raise NotImplementedError("1D bar elements support only one dof per node")
+        self.coords = coords
+        self.blocks = blocks
+        self.dof_per_node = dof_per_node
+        self.num_dof = coords.shape[0] * dof_per_node
+
+        # Block connectivity and material names, as flat arrays
+        self.block_conn = [
+            np.asarray(block["connect"], dtype=np.intp).reshape(-1, 2) for block in blocks
+        ]
+        self.block_material = [block["material"] for block in blocks]
+        self.block_sizes = [4 * len(conn) for conn in self.block_conn]
+
+        num_elem = sum(len(conn) for conn in self.block_conn)
+        self.rows = np.empty(4 * num_elem, dtype=int)
+        self.cols = np.empty(4 * num_elem, dtype=int)
+        self.data = np.empty(4 * num_elem, dtype=float)
+        self.csr_indices: NDArray[int] | None = None
+        self.csr_indptr: NDArray[int] | None = None
+        self.coo_to_csr: sp.csr_matrix | None = None
+        self.eid_to_block: NDArray[int] = np.empty(0, dtype=np.intp)
+        self.eid_to_conn: NDArray[int] = np.empty((0, 2), dtype=np.intp)
+        self.eid_to_he: NDArray[float] = np.empty(0, dtype=float)
+        self._block_elem_map: dict[int, tuple[int, int]] | None = None
+
+    def element_arrays(self, block_elem_map: dict[int, tuple[int, int]]) -> None:
+        """Build flat per-element arrays indexed by global element ID
+
+        ``eid_to_block``, ``eid_to_conn`` and ``eid_to_he`` hold the block index,
+        connectivity and length of each element. Element IDs not
+        assigned to a block have ``eid_to_block == -1``. The arrays are rebuilt only when
+        ``block_elem_map`` differs from the map they were last built from.
+
+        """
+        if block_elem_map == self._block_elem_map:
+            return
+        size = max(block_elem_map, default=-1) + 1
+        self.eid_to_block = np.full(size, -1, dtype=np.intp)
+        self.eid_to_conn = np.zeros((size, 2), dtype=np.intp)
+        eids = np.fromiter(block_elem_map.keys(), dtype=np.intp, count=len(block_elem_map))
+        index = np.array(list(block_elem_map.values()), dtype=np.intp).reshape(-1, 2)
+        for ib, conn in enumerate(self.block_conn):
+            mask = index[:, 0] == ib
+            self.eid_to_block[eids[mask]] = ib
+            self.eid_to_conn[eids[mask]] = conn[index[mask, 1]]
+        xe = self.coords[self.eid_to_conn, 0]
+        self.eid_to_he = xe[:, 1] - xe[:, 0]
+        self._block_elem_map = dict(block_elem_map)
+
+    def check_mesh(self, coords: NDArray[float], blocks: list[dict]) -> None:
+        """Raise ``ValueError`` if the assembler was not built for ``coords`` and ``blocks``"""
+        if coords is not self.coords or blocks is not self.blocks:
+            raise ValueError("assembler was built for a different coords/blocks")
+
+    def block_area(self) -> NDArray[float]:
+        """Return the cross-sectional area of each block"""
+        return np.array(
+            [block["element"]["properties"]["area"] for block in self.blocks], dtype=float
+        )
+
+    def block_modulus(self, materials: dict[str, Any]) -> NDArray[float]:
+        """Return the Young's modulus of the material of each block"""
+        return np.array(
+            [materials[name]["parameters"]["E"] for name in self.block_material], dtype=float
+        )
+
+    def block_density(self, materials: dict[str, Any], which: NDArray[int]) -> NDArray[float]:
+        """Return the density of the material of each block in ``which``"""
+        return np.array(
+            [materials[self.block_material[ib]]["density"] for ib in which], dtype=float
+        )
+
+    def stiffness(self, materials: dict[str, Any]) -> sp.csr_matrix:
+        """Assemble the global stiffness matrix for the given materials"""
+        return self.stiffness_batch([materials])[0]
+
+    def stiffness_batch(self, materials_batch: list[dict[str, Any]]) -> list[sp.csr_matrix]:
+        """Assemble the global stiffness matrices for a batch of material sets
+
+        The batch is held in hybrid COO form: the shared (rows, cols) pattern and a
+        ``(batch, nnz)`` data array. Element data scale linearly with ``A * E``, so the
+        data of every batch member is the unit (``A * E = 1``) element data scaled per
+        block, mapped to CSR for the whole batch with one product by ``coo_to_csr``.
+
+        """
+        indices, indptr, coo_to_csr = self._pattern()
+        E = np.array(
+            [self.block_modulus(materials) for materials in materials_batch], dtype=float
+        ).reshape(len(materials_batch), len(self.blocks))
+        AE = self.block_area() * E
+        data = np.repeat(AE, self.block_sizes, axis=1) * self.data
+        csr_data = np.ascontiguousarray((coo_to_csr @ data.T).T)
+        shape = (self.num_dof, self.num_dof)
+        # Each matrix gets its own copy of the pattern so that in-place operations on a
+        # returned matrix cannot corrupt the cached pattern
+        return [sp.csr_matrix((d, indices.copy(), indptr.copy()), shape=shape) for d in csr_data]
+
+    def _pattern(self) -> tuple[NDArray[np.intp], NDArray[np.intp], sp.csr_matrix]:
+        """Return the CSR ``indices``, ``indptr`` and ``coo_to_csr`` map, building them once"""
+        if self.csr_indices is None or self.csr_indptr is None or self.coo_to_csr is None:
+            return self._build_pattern()
+        return self.csr_indices, self.csr_indptr, self.coo_to_csr
+
+    def _build_pattern(self) -> tuple[NDArray[np.intp], NDArray[np.intp], sp.csr_matrix]:
+        """Compute the unit element data and the CSR sparsity pattern of the mesh"""
+        k = 0
+        for conn in self.block_conn:
+            # All elements of the block are processed at once
+            m = 4 * conn.shape[0]
+            element_triplets(
+                self.coords,
+                conn,
+                1.0,
+                self.rows[k : k + m],
+                self.cols[k : k + m],
+                self.data[k : k + m],
+            )
+            k += m
+
+        shape = (self.num_dof, self.num_dof)
+        K = sp.coo_matrix((self.data, (self.rows, self.cols)), shape=shape).tocsr()
+        K.sort_indices()
+        self.csr_indices = K.indices
+        self.csr_indptr = K.indptr
+        # Position of each CSR entry in K.data, offset by one so that the first
+        # position is not dropped as a structural zero
+        nnz = K.nnz
+        global_to_csr = sp.csr_matrix((np.arange(1, nnz + 1), K.indices, K.indptr), shape=shape)
+        pos = np.asarray(global_to_csr[self.rows, self.cols]).ravel() - 1
+        n = len(self.rows)
+        self.coo_to_csr = sp.csr_matrix((np.ones(n), (pos, np.arange(n))), shape=(nnz, n))
+        return self.csr_indices, self.csr_indptr, self.coo_to_csr
+
+
 def global_dof(node: int, local_dof: int, dof_per_node: int) -> int:
     """Return the global degree of freedom index for a given node and local dof
 
@@ -283,7 +518,145 @@ def global_dof(node: int, local_dof: int, dof_per_node: int) -> int:
 
     See Also
     --------
-    first_fe_code : Uses this function to assemble global stiffness and force matrices.
+    boundary_dofs : Applies this mapping to all nodes of a boundary condition at once.
+    element_freedom_table : Applies this mapping to the nodes of all elements at once.
 
     """
     return node * dof_per_node + local_dof
+
+
+def boundary_dofs(
+    bcs: list[dict], bc_type: int, dof_per_node: int
+) -> tuple[NDArray[int], NDArray[float]]:
+    """Return the global dofs and values of all boundary conditions of type ``bc_type``
+
+    Each node of a boundary condition contributes one entry. The global dof is computed
+    as ``node * dof_per_node + local_dof`` (see :func:`global_dof`) for all nodes of a
+    boundary condition at once.
+
+    """
+    dofs: list[NDArray[int]] = [np.empty(0, dtype=np.intp)]
+    vals: list[NDArray[float]] = [np.empty(0, dtype=float)]
+    for bc in bcs:
+        if bc["type"] == bc_type:
+            nodes = np.asarray(bc["nodes"], dtype=np.intp)
+            dofs.append(nodes * dof_per_node + bc["local_dof"])
+            vals.append(np.full(nodes.size, bc["value"], dtype=float))
+    return np.concatenate(dofs), np.concatenate(vals)
+
+
+def element_freedom_table(conn: NDArray[int], dof_per_node: int) -> NDArray[int]:
+    """Return the element freedom table of each element
+
+    ``conn`` has one row of node indices per element. Row ``e`` of the result lists the
+    global dofs of element ``e``, node by node and local dof by local dof, as computed
+    by :func:`global_dof`. For one dof per node the global dofs are the node indices
+    themselves.
+
+    """
+    if dof_per_node == 1:
+        return conn
+    # GLOBAL DOF = NODE NUMBER x NUMBER OF DOF PER NODE + LOCAL DOF
+    eft = conn[:, :, None] * dof_per_node + np.arange(dof_per_node)
+    return eft.reshape(conn.shape[0], -1)
+
+
+def solve_reduced(Kff: sp.csr_matrix, Ff: NDArray[float]) -> NDArray[float]:
+    """Solve the Dirichlet-reduced system ``Kff * uf = Ff``
+
+    When nodes are numbered sequentially along the bar, ``Kff`` is tridiagonal and the
+    system is solved in O(N) with :func:`scipy.linalg.solve_banded`. Otherwise a sparse
+    direct solve is used.
+
+    Raises
+    ------
+    numpy.linalg.LinAlgError
+        If ``Kff`` is singular.
+
+    """
+    coo = Kff.tocoo()
+    if coo.nnz and np.max(np.abs(coo.row - coo.col)) > 1:
+        try:
+            lu = splu(Kff.tocsc())
+        except RuntimeError as e:
+            raise np.linalg.LinAlgError(f"Singular matrix: {e}") from None
+        uf = lu.solve(Ff)
+        if not np.all(np.isfinite(uf)):
+            raise np.linalg.LinAlgError("Singular matrix")
+        return uf
+    n = Kff.shape[0]
+    ab = np.zeros((3, n), dtype=float)
+    ab[0, 1:] = Kff.diagonal(1)
+    ab[1, :] = Kff.diagonal(0)
+    ab[2, :-1] = Kff.diagonal(-1)
+    return la.solve_banded((1, 1), ab, Ff)
+
+
+def element_triplets(
+    coords: NDArray[float],
+    conn: NDArray[int],
+    AE: float,
+    rows: NDArray[int],
+    cols: NDArray[int],
+    data: NDArray[float],
+) -> None:
+    """Write the COO stiffness triplets of a block of 1D bar elements in place.
+
+    Element ``e`` with nodes ``(n0, n1)`` and length ``h`` fills slots ``4*e:4*e+4`` of
+    ``rows``, ``cols`` and ``data`` with the entries of
+
+        ke = (A * E / h) * [[ 1, -1 ],
+                            [ -1,  1 ]]
+
+    in row-major order, with one dof per node. The Numba kernel is used when Numba is
+    installed, otherwise the triplets are computed with NumPy array operations.
+
+    Raises
+    ------
+    ValueError
+        If any element has zero length.
+
+    """
+    if conn.size == 0:
+        return
+    if _assemble_triplets is not None:
+        _assemble_triplets(coords, conn, AE, rows, cols, data)
+    else:
+        xe = coords[conn, 0]
+        with np.errstate(divide="ignore"):
+            ke_scale = AE / (xe[:, 1] - xe[:, 0])
+        rows[:] = np.repeat(conn, 2, axis=1).reshape(-1)
+        cols[:] = np.tile(conn, 2).reshape(-1)
+        np.multiply(ke_scale[:, None], _KE_TEMPLATE, out=data.reshape(-1, 4))
+    # A zero-length element has an infinite stiffness scale; one vectorized test over
+    # the diagonal entries replaces a per-element length check
+    bad = np.flatnonzero(~np.isfinite(data[::4]))
+    if bad.size:
+        nodes = conn[bad].tolist()
+        raise ValueError(f"Zero-length element(s) detected between nodes {nodes}")
+
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True, error_model="numpy")
+    def _assemble_triplets(coords, conn, AE, rows, cols, data):
+        for e in prange(conn.shape[0]):
+            n0 = conn[e, 0]
+            n1 = conn[e, 1]
+            k = AE / (coords[n1, 0] - coords[n0, 0])
+            j = 4 * e
+            rows[j] = n0
+            cols[j] = n0
+            data[j] = k
+            rows[j + 1] = n0
+            cols[j + 1] = n1
+            data[j + 1] = -k
+            rows[j + 2] = n1
+            cols[j + 2] = n0
+            data[j + 2] = -k
+            rows[j + 3] = n1
+            cols[j + 3] = n1
+            data[j + 3] = k
+
+else:  # pragma: no cover
+    _assemble_triplets = None
@@ -1,9 +1,13 @@
 import io
 
 import numpy as np
+import pytest
+import scipy.sparse as sp
 
 import wundy
 import wundy.first
+from wundy.schemas import DIRICHLET
+from wundy.schemas import NEUMANN
 
 
 def test_first_1():
@@ -51,9 +55,11 @@ wundy:
     K = soln["stiff"]
     F = soln["force"]
     assert np.allclose(dofs, [0, 0.2, 0.4, 0.6, 0.8])
+    assert K.format == "csr"
+    assert K.nnz == 13
     assert np.allclose(F, [0, 0, 0, 0, 2])
     assert np.allclose(
-        K,
+        K.toarray(),
         [
             [10, -10, 0, 0, 0],
             [-10, 20, -10, 0, 0],
@@ -112,13 +118,13 @@ wundy:
     dofs = soln["dofs"]
     K = soln["stiff"]
     F = soln["force"]
-    R = np.dot(K, dofs) - F
+    R = K @ dofs - F
     q = 8
     L = 4
     assert R[0] == -q * L
 
     assert np.allclose(
-        K,
+        K.toarray(),
         [
             [10, -10, 0, 0, 0],
             [-10, 20, -10, 0, 0],
@@ -127,3 +133,355 @@ wundy:
             [0, 0, 0, -10, 10],
         ],
     )
+
+
+def test_first_3():
+    file = io.StringIO()
+    file.write("""\
+wundy:
+  nodes: [[1, 0], [2, 0.5], [3, 2], [4, 3], [5, 4]]
+  elements: [[1, 1, 2], [2, 2, 3], [3, 3, 4], [4, 4, 5]]
+  boundary conditions:
+  - name: fix-nodes
+    dof: x
+    nodes: [1]
+  concentrated loads:
+  - name: cload-1
+    nodes: [5]
+    value: 6.0
+  element sets:
+  - name: left
+    elements: [1, 2]
+  - name: right
+    elements: [3, 4]
+  materials:
+  - type: elastic
+    name: mat-1
+    parameters:
+      E: 10.0
+      nu: 0.3
+  - type: elastic
+    name: mat-2
+    parameters:
+      E: 20.0
+      nu: 0.3
+  element blocks:
+  - material: mat-1
+    name: block-1
+    elements: left
+    element:
+      type: t1d1
+      properties:
+        area: 1
+  - material: mat-2
+    name: block-2
+    elements: right
+    element:
+      type: t1d1
+      properties:
+        area: 3
+""")
+    file.seek(0)
+    data = wundy.ui.load(file)
+    inp = wundy.ui.preprocess(data)
+    soln = wundy.first.first_fe_code(
+        inp["coords"],
+        inp["blocks"],
+        inp["bcs"],
+        inp["dload"],
+        inp["materials"],
+        inp["block_elem_map"],
+    )
+
+    # Constant axial force P: u(x) = u(x0) + P * dx / (A * E) within each block
+    dofs = soln["dofs"]
+    P = 6.0
+    u2 = P * 2 / (1 * 10.0)
+    assert np.allclose(dofs, [0, P * 0.5 / 10.0, u2, u2 + P / 60.0, u2 + 2 * P / 60.0])
+
+
+def test_element_triplets(monkeypatch):
+    coords = np.array([[0.0], [0.5], [2.0], [3.0]])
+    conn = np.array([[0, 1], [1, 2], [2, 3]])
+    for kernel in (wundy.first._assemble_triplets, None):
+        monkeypatch.setattr(wundy.first, "_assemble_triplets", kernel)
+        rows = np.empty(12, dtype=int)
+        cols = np.empty(12, dtype=int)
+        data = np.empty(12, dtype=float)
+        wundy.first.element_triplets(coords, conn, 6.0, rows, cols, data)
+        assert np.array_equal(rows, [0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3])
+        assert np.array_equal(cols, [0, 1, 0, 1, 1, 2, 1, 2, 2, 3, 2, 3])
+        assert np.allclose(data, [12, -12, -12, 12, 4, -4, -4, 4, 6, -6, -6, 6])
+
+        bad = np.array([[0.0], [1.0], [1.0]])
+        with pytest.raises(
+            ValueError, match=r"Zero-length element\(s\) detected between nodes \[\[1, 2\]\]"
+        ):
+            wundy.first.element_triplets(bad, conn[:2], 6.0, rows[:8], cols[:8], data[:8])
+
+
+def test_first_assembler_reuse():
+    file = io.StringIO()
+    file.write("""\
+wundy:
+  nodes: [[1, 0], [2, 1], [3, 3], [4, 4]]
+  elements: [[1, 1, 2], [2, 2, 3], [3, 3, 4]]
+  boundary conditions:
+  - name: fix-nodes
+    dof: x
+    nodes: [1]
+  concentrated loads:
+  - name: cload-1
+    nodes: [4]
+    value: 2.0
+  materials:
+  - type: elastic
+    name: mat-1
+    parameters:
+      E: 10.0
+      nu: 0.3
+  element blocks:
+  - material: mat-1
+    name: block-1
+    elements: all
+    element:
+      type: t1d1
+      properties:
+        area: 1
+""")
+    file.seek(0)
+    data = wundy.ui.load(file)
+    inp = wundy.ui.preprocess(data)
+    args = (
+        inp["coords"],
+        inp["blocks"],
+        inp["bcs"],
+        inp["dload"],
+        inp["materials"],
+        inp["block_elem_map"],
+    )
+    assembler = wundy.first.FirstFEAssembler(inp["coords"], inp["blocks"])
+    soln_1 = wundy.first.first_fe_code(*args, assembler=assembler)
+    assert assembler.coo_to_csr is not None
+
+    inp["materials"]["MAT-1"]["parameters"]["E"] = 20.0
+    soln_2 = wundy.first.first_fe_code(*args, assembler=assembler)
+    soln_3 = wundy.first.first_fe_code(*args)
+    assert np.allclose(soln_2["dofs"], soln_1["dofs"] / 2)
+    assert np.allclose(soln_2["dofs"], soln_3["dofs"])
+    assert np.allclose(soln_2["stiff"].toarray(), soln_3["stiff"].toarray())
+
+
+def test_first_unordered_nodes():
+    # Nodes not numbered along the bar, so the reduced stiffness is not tridiagonal
+    file = io.StringIO()
+    file.write("""\
+wundy:
+  nodes: [[1, 0], [5, 4], [3, 2], [2, 1], [4, 3]]
+  elements: [[1, 1, 2], [2, 2, 3], [3, 3, 4], [4, 4, 5]]
+  boundary conditions:
+  - name: fix-nodes
+    dof: x
+    nodes: [1]
+  concentrated loads:
+  - name: cload-1
+    nodes: [5]
+    value: 2.0
+  materials:
+  - type: elastic
+    name: mat-1
+    parameters:
+      E: 10.0
+      nu: 0.3
+  element blocks:
+  - material: mat-1
+    name: block-1
+    elements: all
+    element:
+      type: t1d1
+      properties:
+        area: 1
+""")
+    file.seek(0)
+    data = wundy.ui.load(file)
+    inp = wundy.ui.preprocess(data)
+    soln = wundy.first.first_fe_code(
+        inp["coords"],
+        inp["blocks"],
+        inp["bcs"],
+        inp["dload"],
+        inp["materials"],
+        inp["block_elem_map"],
+    )
+    assert np.allclose(soln["dofs"], 0.2 * inp["coords"][:, 0])
+
+
+def test_first_dloads():
+    coords = np.array([[0.0], [1.0], [3.0], [4.0]])
+    blocks = [
+        {"element": {"properties": {"area": 2.0}}, "material": "A", "connect": [[0, 1], [1, 2]]},
+        {"element": {"properties": {"area": 1.0}}, "material": "B", "connect": [[2, 3]]},
+    ]
+    materials = {
+        "A": {"parameters": {"E": 10.0}, "density": 3.0},
+        "B": {"parameters": {"E": 10.0}, "density": 5.0},
+    }
+    block_elem_map = {0: (0, 0), 1: (0, 1), 2: (1, 0)}
+    bcs = [{"type": DIRICHLET, "nodes": [0], "local_dof": 0, "value": 0.0}]
+    dloads = [
+        {"name": "bx", "type": "BX", "direction": [1.0], "value": 2.0, "elements": [0, 2]},
+        {"name": "grav", "type": "GRAV", "direction": [-1.0], "value": 1.0, "elements": [1, 2]},
+    ]
+    soln = wundy.first.first_fe_code(coords, blocks, bcs, dloads, materials, block_elem_map)
+    # BX: q * L / 2 on each node of elements 0 and 2
+    # GRAV: -rho * A * g * L / 2 on each node of elements 1 and 2
+    F = [1.0, 1.0 - 6.0, 1.0 - 6.0 - 2.5, 1.0 - 2.5]
+    assert np.allclose(soln["force"], F)
+
+    dloads = [{"name": "bx", "type": "BX", "direction": [1.0], "value": 2.0, "elements": [3]}]
+    with pytest.raises(ValueError, match="Element 3 in distributed load bx"):
+        wundy.first.first_fe_code(coords, blocks, bcs, dloads, materials, block_elem_map)
+
+
+def test_first_batched():
+    coords = np.array([[0.0], [1.0], [3.0], [4.0]])
+    blocks = [
+        {"element": {"properties": {"area": 2.0}}, "material": "A", "connect": [[0, 1], [1, 2]]},
+        {"element": {"properties": {"area": 1.0}}, "material": "B", "connect": [[2, 3]]},
+    ]
+    block_elem_map = {0: (0, 0), 1: (0, 1), 2: (1, 0)}
+    bcs = [
+        {"type": DIRICHLET, "nodes": [0], "local_dof": 0, "value": 0.0},
+        {"type": NEUMANN, "nodes": [3], "local_dof": 0, "value": 4.0},
+    ]
+    dloads = [{"name": "bx", "type": "BX", "direction": [1.0], "value": 2.0, "elements": [1]}]
+    materials_batch = [
+        {"A": {"parameters": {"E": E_a}}, "B": {"parameters": {"E": E_b}}}
+        for E_a, E_b in [(10.0, 10.0), (10.0, 40.0), (5.0, 20.0)]
+    ]
+    solns = wundy.first.first_fe_code_batched(
+        coords, blocks, bcs, dloads, materials_batch, block_elem_map
+    )
+    assert len(solns) == len(materials_batch)
+    for soln, materials in zip(solns, materials_batch):
+        expected = wundy.first.first_fe_code(coords, blocks, bcs, dloads, materials, block_elem_map)
+        assert np.allclose(soln["dofs"], expected["dofs"])
+        assert np.allclose(soln["stiff"].toarray(), expected["stiff"].toarray())
+        assert np.allclose(soln["force"], expected["force"])
+
+
+def test_first_grav_mixed_density():
+    # Density is only needed for the materials of blocks with gravity loads
+    coords = np.array([[0.0], [1.0], [2.0]])
+    blocks = [
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": [[0, 1]]},
+        {"element": {"properties": {"area": 1.0}}, "material": "B", "connect": [[1, 2]]},
+    ]
+    materials = {
+        "A": {"parameters": {"E": 1.0}, "density": 2.0},
+        "B": {"parameters": {"E": 1.0}},
+    }
+    block_elem_map = {0: (0, 0), 1: (1, 0)}
+    bcs = [{"type": DIRICHLET, "nodes": [0], "local_dof": 0, "value": 0.0}]
+    dloads = [{"name": "grav", "type": "GRAV", "direction": [1.0], "value": 1.0, "elements": [0]}]
+    soln = wundy.first.first_fe_code(coords, blocks, bcs, dloads, materials, block_elem_map)
+    assert np.allclose(soln["force"], [1, 1, 0])
+    assert np.allclose(soln["dofs"], [0, 1, 1])
+
+
+def test_assembler_element_arrays():
+    coords = np.array([[0.0], [1.0], [3.0]])
+    blocks = [
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": [[0, 1], [1, 2]]}
+    ]
+    assembler = wundy.first.FirstFEAssembler(coords, blocks)
+    assembler.element_arrays({0: (0, 0), 1: (0, 1)})
+    assert np.array_equal(assembler.eid_to_conn, [[0, 1], [1, 2]])
+    assert np.allclose(assembler.eid_to_he, [1, 2])
+
+    # A different map rebuilds the arrays
+    assembler.element_arrays({0: (0, 1), 1: (0, 0)})
+    assert np.array_equal(assembler.eid_to_conn, [[1, 2], [0, 1]])
+    assert np.allclose(assembler.eid_to_he, [2, 1])
+
+
+def test_assembler_pattern_not_shared():
+    coords = np.array([[0.0], [1.0], [3.0]])
+    blocks = [
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": [[0, 1], [1, 2]]}
+    ]
+    materials = {"A": {"parameters": {"E": 2.0}}}
+    assembler = wundy.first.FirstFEAssembler(coords, blocks)
+    K1 = assembler.stiffness(materials)
+    expected = K1.toarray()
+    assert K1.indptr is not assembler.csr_indptr
+    assert K1.indices is not assembler.csr_indices
+
+    # In-place operations on a returned matrix must not affect later assemblies
+    K1.data[:] = 0.0
+    K1.eliminate_zeros()
+    K2 = assembler.stiffness(materials)
+    assert np.allclose(K2.toarray(), expected)
+
+
+def test_assembler_reads_area_per_call():
+    coords = np.array([[0.0], [1.0], [2.0]])
+    blocks = [
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": [[0, 1], [1, 2]]}
+    ]
+    materials = {"A": {"parameters": {"E": 1.0}}}
+    block_elem_map = {0: (0, 0), 1: (0, 1)}
+    bcs = [
+        {"type": DIRICHLET, "nodes": [0], "local_dof": 0, "value": 0.0},
+        {"type": NEUMANN, "nodes": [2], "local_dof": 0, "value": 1.0},
+    ]
+    assembler = wundy.first.FirstFEAssembler(coords, blocks)
+    args = (coords, blocks, bcs, [], materials, block_elem_map)
+    soln = wundy.first.first_fe_code(*args, assembler=assembler)
+    assert np.allclose(soln["dofs"], [0, 1, 2])
+
+    blocks[0]["element"]["properties"]["area"] = 2.0
+    soln = wundy.first.first_fe_code(*args, assembler=assembler)
+    assert np.allclose(soln["dofs"], [0, 0.5, 1])
+
+    with pytest.raises(ValueError, match="different coords/blocks"):
+        wundy.first.first_fe_code(coords.copy(), *args[1:], assembler=assembler)
+
+
+def test_solve_reduced_singular():
+    # Unconstrained bar with nodes not numbered along it (sparse path) and along it
+    # (banded path)
+    K = np.array([[1.0, 0.0, -1.0], [0.0, 1.0, -1.0], [-1.0, -1.0, 2.0]])
+    for p in ([0, 1, 2], [0, 2, 1]):
+        Kff = sp.csr_matrix(K[np.ix_(p, p)])
+        with pytest.raises(np.linalg.LinAlgError):
+            wundy.first.solve_reduced(Kff, np.ones(3))
+
+
+def test_element_freedom_table():
+    conn = np.array([[0, 1], [1, 2]])
+    assert wundy.first.element_freedom_table(conn, 1) is conn
+    eft = wundy.first.element_freedom_table(conn, 2)
+    assert np.array_equal(eft, [[0, 1, 2, 3], [2, 3, 4, 5]])
+    with pytest.raises(NotImplementedError):
+        wundy.first.FirstFEAssembler(np.zeros((3, 1)), [], dof_per_node=2)
+
+
+def test_first_empty_block():
+    coords = np.array([[0.0], [1.0], [2.0]])
+    blocks = [
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": [[0, 1], [1, 2]]},
+        {"element": {"properties": {"area": 1.0}}, "material": "A", "connect": []},
+    ]
+    materials = {"A": {"parameters": {"E": 1.0}}}
+    block_elem_map = {0: (0, 0), 1: (0, 1)}
+    bcs = [
+        {"type": DIRICHLET, "nodes": [0], "local_dof": 0, "value": 0.0},
+        {"type": NEUMANN, "nodes": [1], "local_dof": 0, "value": 1.0},
+    ]
+    soln = wundy.first.first_fe_code(coords, blocks, bcs, [], materials, block_elem_map)
+    assert np.allclose(soln["dofs"], [0, 1, 1])
+
+    dloads = [{"name": "bx", "type": "BX", "direction": [1.0], "value": 2.0, "elements": [1]}]
+    soln = wundy.first.first_fe_code(coords, blocks, bcs, dloads, materials, block_elem_map)
+    assert np.allclose(soln["force"], [0, 2, 1])